@@ -1,15 +1,44 @@
-import random
 import os
-from typing import Dict, Any
+import sys
+from dataclasses import dataclass, fields
+from itertools import islice
+from typing import Dict
+
+import numpy as np
+
+# Nominal voltage per cell type
+VOLTAGE_MAP = {
+    "lfp": 3.2,
+    "li-ion": 3.6,
+    "nicad": 1.2,
+    "nimh": 1.2,
+    "lead-acid": 2.0
+}
+
+@dataclass(slots=True)
+class Cell:
+    """State of a single monitored cell"""
+    voltage: float
+    current: float
+    temp: float
+    capacity: float
+    status: str
+
+# Field names in report order
+CELL_FIELDS = tuple(field.name for field in fields(Cell))
 
 class BatteryCellMonitor:
+    VALID_CELL_TYPES = frozenset(VOLTAGE_MAP)
+    VALID_CELL_TYPES_DISPLAY = ", ".join(VOLTAGE_MAP)
+    
     def __init__(self):
-        self.cells_data: Dict[str, Dict[str, Any]] = {}
-        self.valid_cell_types = ["lfp", "li-ion", "nicad", "nimh", "lead-acid"]
+        self.cells_data: Dict[str, Cell] = {}
+        self.rng = np.random.default_rng()
     
     def clear_screen(self):
         """Clear the console screen"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        sys.stdout.write("\x1b[2J\x1b[H")
+        sys.stdout.flush()
     
     def display_header(self):
         """Display program header"""
@@ -21,7 +50,7 @@ class BatteryCellMonitor:
     def get_cell_types(self):
         """Interactive cell type input with validation"""
         print("📋 STEP 1: Enter Cell Types")
-        print(f"Valid cell types: {', '.join(self.valid_cell_types)}")
+        print(f"Valid cell types: {self.VALID_CELL_TYPES_DISPLAY}")
         print("(Press Enter without input to finish, minimum 1 cell required)")
         print("-" * 50)
         
@@ -42,8 +71,8 @@ class BatteryCellMonitor:
                 else:
                     break
             
-            if cell_type not in self.valid_cell_types:
-                print(f"❌ Invalid cell type! Use one of: {', '.join(self.valid_cell_types)}")
+            if cell_type not in self.VALID_CELL_TYPES:
+                print(f"❌ Invalid cell type! Use one of: {self.VALID_CELL_TYPES_DISPLAY}")
                 continue
             
             list_of_cells.append(cell_type)
@@ -57,30 +86,25 @@ class BatteryCellMonitor:
         print(f"\n🔋 STEP 2: Initializing {len(cell_types)} cells...")
         print("-" * 50)
         
+        # Draw all starting temperatures in one call
+        temps = np.round(self.rng.uniform(25, 40, len(cell_types)), 1).tolist()
+        
         for idx, cell_type in enumerate(cell_types, start=1):
             cell_key = f"cell_{idx}_{cell_type}"
             
             # Set default voltage based on cell type
-            voltage_map = {
-                "lfp": 3.2,
-                "li-ion": 3.6,
-                "nicad": 1.2,
-                "nimh": 1.2,
-                "lead-acid": 2.0
-            }
-            
-            voltage = voltage_map.get(cell_type, 3.6)
+            voltage = VOLTAGE_MAP.get(cell_type, 3.6)
             current = 0.0
-            temp = round(random.uniform(25, 40), 1)
+            temp = temps[idx - 1]
             capacity = round(voltage * current, 2)
             
-            self.cells_data[cell_key] = {
-                "voltage": voltage,
-                "current": current,
-                "temp": temp,
-                "capacity": capacity,
-                "status": "Initialized"
-            }
+            self.cells_data[cell_key] = Cell(
+                voltage=voltage,
+                current=current,
+                temp=temp,
+                capacity=capacity,
+                status="Initialized"
+            )
             
             print(f"✅ {cell_key}: V={voltage}V, T={temp}°C")
     
@@ -91,14 +115,52 @@ class BatteryCellMonitor:
         print(f"{'Cell ID':<20} {'Voltage':<10} {'Current':<10} {'Temp':<10} {'Capacity':<12} {'Status':<10}")
         print("-" * 80)
         
-        for cell_id, data in self.cells_data.items():
-            print(f"{cell_id:<20} {data['voltage']:<10}V {data['current']:<10}A "
-                  f"{data['temp']:<10}°C {data['capacity']:<12}Wh {data['status']:<10}")
+        for cell_id, cell in self.cells_data.items():
+            print(f"{cell_id:<20} {cell.voltage:<10}V {cell.current:<10}A "
+                  f"{cell.temp:<10}°C {cell.capacity:<12}Wh {cell.status:<10}")
         print("-" * 80)
     
+    def update_currents_bulk(self):
+        """Update all currents from one comma-separated line"""
+        bulk = input(f"Enter {len(self.cells_data)} currents as comma-separated values "
+                     "(or press Enter to go cell by cell): ").strip()
+        if not bulk:
+            return False
+        
+        try:
+            currents = np.array(bulk.split(","), dtype=np.float64)
+        except ValueError:
+            print("❌ Please enter valid numbers!")
+            return False
+        
+        if len(currents) != len(self.cells_data):
+            print(f"❌ Expected {len(self.cells_data)} values, got {len(currents)}!")
+            return False
+        
+        if (currents < 0).any():
+            print("❌ Current cannot be negative!")
+            return False
+        
+        # Recalculate all capacities and statuses at once, then write back in one pass
+        voltages = np.array([cell.voltage for cell in self.cells_data.values()])
+        capacities = np.round(voltages * currents, 2)
+        statuses = np.where(currents > 0, "Active", "Standby")
+        
+        for cell, current, capacity, status in zip(self.cells_data.values(), currents.tolist(),
+                                                   capacities.tolist(), statuses.tolist()):
+            cell.current = current
+            cell.capacity = capacity
+            cell.status = status
+        
+        print(f"✅ Updated {len(currents)} cells")
+        return True
+    
     def update_current_values(self):
         """Interactive current value updates"""
         print("\n⚡ STEP 3: Update Current Values")
+        if self.update_currents_bulk():
+            return
+        
         print("(Enter 0 to skip a cell, or 'q' to quit updating)")
         print("-" * 50)
         
@@ -118,17 +180,17 @@ class BatteryCellMonitor:
                         continue
                     
                     # Update current and recalculate capacity
-                    voltage = self.cells_data[cell_id]['voltage']
-                    self.cells_data[cell_id]["current"] = current
-                    self.cells_data[cell_id]["capacity"] = round(voltage * current, 2)
+                    cell = self.cells_data[cell_id]
+                    cell.current = current
+                    cell.capacity = round(cell.voltage * current, 2)
                     
                     # Update status
                     if current > 0:
-                        self.cells_data[cell_id]["status"] = "Active"
+                        cell.status = "Active"
                     else:
-                        self.cells_data[cell_id]["status"] = "Standby"
+                        cell.status = "Standby"
                     
-                    print(f"✅ Updated {cell_id}: {current}A -> {self.cells_data[cell_id]['capacity']}Wh")
+                    print(f"✅ Updated {cell_id}: {current}A -> {cell.capacity}Wh")
                     break
                     
                 except ValueError:
@@ -169,6 +231,12 @@ class BatteryCellMonitor:
             else:
                 print("❌ Invalid option! Please try again.")
     
+    def _cell_id_at(self, cell_num):
+        """Return the cell ID at a zero-based menu position"""
+        if not 0 <= cell_num < len(self.cells_data):
+            raise IndexError(cell_num)
+        return next(islice(self.cells_data, cell_num, None))
+    
     def update_single_cell_current(self):
         """Update current for a specific cell"""
         if not self.cells_data:
@@ -181,17 +249,17 @@ class BatteryCellMonitor:
         
         try:
             cell_num = int(input("Enter cell number to update: ")) - 1
-            cell_id = list(self.cells_data.keys())[cell_num]
+            cell_id = self._cell_id_at(cell_num)
             
             current = float(input(f"Enter new current for {cell_id} (A): "))
             if current < 0:
                 print("❌ Current cannot be negative!")
                 return
             
-            voltage = self.cells_data[cell_id]['voltage']
-            self.cells_data[cell_id]["current"] = current
-            self.cells_data[cell_id]["capacity"] = round(voltage * current, 2)
-            self.cells_data[cell_id]["status"] = "Active" if current > 0 else "Standby"
+            cell = self.cells_data[cell_id]
+            cell.current = current
+            cell.capacity = round(cell.voltage * current, 2)
+            cell.status = "Active" if current > 0 else "Standby"
             
             print(f"✅ Updated {cell_id} successfully!")
             
@@ -204,26 +272,25 @@ class BatteryCellMonitor:
             print("❌ Maximum 8 cells reached!")
             return
         
-        print(f"Valid cell types: {', '.join(self.valid_cell_types)}")
+        print(f"Valid cell types: {self.VALID_CELL_TYPES_DISPLAY}")
         cell_type = input("Enter new cell type: ").strip().lower()
         
-        if cell_type not in self.valid_cell_types:
+        if cell_type not in self.VALID_CELL_TYPES:
             print("❌ Invalid cell type!")
             return
         
         cell_num = len(self.cells_data) + 1
         cell_id = f"cell_{cell_num}_{cell_type}"
         
-        voltage_map = {"lfp": 3.2, "li-ion": 3.6, "nicad": 1.2, "nimh": 1.2, "lead-acid": 2.0}
-        voltage = voltage_map.get(cell_type, 3.6)
+        voltage = VOLTAGE_MAP.get(cell_type, 3.6)
         
-        self.cells_data[cell_id] = {
-            "voltage": voltage,
-            "current": 0.0,
-            "temp": round(random.uniform(25, 40), 1),
-            "capacity": 0.0,
-            "status": "Initialized"
-        }
+        self.cells_data[cell_id] = Cell(
+            voltage=voltage,
+            current=0.0,
+            temp=round(float(self.rng.uniform(25, 40)), 1),
+            capacity=0.0,
+            status="Initialized"
+        )
         
         print(f"✅ Added new cell: {cell_id}")
     
@@ -239,7 +306,7 @@ class BatteryCellMonitor:
         
         try:
             cell_num = int(input("Enter cell number to remove: ")) - 1
-            cell_id = list(self.cells_data.keys())[cell_num]
+            cell_id = self._cell_id_at(cell_num)
             
             confirm = input(f"Are you sure you want to remove {cell_id}? (y/N): ").strip().lower()
             if confirm == 'y':
@@ -256,16 +323,15 @@ class BatteryCellMonitor:
         filename = input("Enter filename (without extension): ").strip() or "cell_data"
         filename += ".txt"
         
+        parts = ["Battery Cell Status Report\n", "=" * 50 + "\n\n"]
+        for cell_id, cell in self.cells_data.items():
+            parts.append(f"{cell_id}:\n")
+            parts.extend(f"  {name}: {getattr(cell, name)}\n" for name in CELL_FIELDS)
+            parts.append("\n")
+        
         try:
             with open(filename, 'w') as f:
-                f.write("Battery Cell Status Report\n")
-                f.write("=" * 50 + "\n\n")
-                
-                for cell_id, data in self.cells_data.items():
-                    f.write(f"{cell_id}:\n")
-                    for key, value in data.items():
-                        f.write(f"  {key}: {value}\n")
-                    f.write("\n")
+                f.write("".join(parts))
             
             print(f"✅ Data exported to {filename}")
             
@@ -274,6 +340,8 @@ class BatteryCellMonitor:
     
     def run(self):
         """Main program execution"""
+        if os.name == 'nt':
+            os.system('')  # Enables ANSI escape handling in Windows consoles
         self.clear_screen()
         self.display_header()
         
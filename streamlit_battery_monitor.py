@@ -2,14 +2,27 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from plotly.subplots import make_subplots
-import random
 import numpy as np
 from datetime import datetime, timedelta
+from functools import partial
+from itertools import repeat
+import csv
 import json
 import os
 import time
 
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the NumPy tick is used instead
+    njit = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; needed only for .parquet data files
+    pa = None
+
 # Page configuration
 st.set_page_config(
     page_title="Battery Cell Data Logger",
@@ -19,7 +32,7 @@ st.set_page_config(
 )
 
 # Minimal CSS for clean UI
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .metric-container {
         background-color: #f0f2f6;
@@ -41,14 +54,26 @@ st.markdown("""
         font-size: 0.9rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def get_custom_css():
+    """Return CUSTOM_CSS with whitespace collapsed, built once per process"""
+    return " ".join(CUSTOM_CSS.split())
+
+# Streamlit drops elements that aren't re-emitted, so this runs on every rerun
+st.markdown(get_custom_css(), unsafe_allow_html=True)
 
 # Initialize session state
 def init_session_state():
-    if 'cells_data' not in st.session_state:
-        st.session_state.cells_data = {}
-    if 'historical_data' not in st.session_state:
-        st.session_state.historical_data = pd.DataFrame()
+    if 'historical_chunks' not in st.session_state:
+        st.session_state.historical_chunks = []
+    if 'historical_rows' not in st.session_state:
+        st.session_state.historical_rows = 0
+    if 'historical_cache' not in st.session_state:
+        st.session_state.historical_cache = None
+    if 'time_series_cache' not in st.session_state:
+        st.session_state.time_series_cache = None
     if 'tasks' not in st.session_state:
         st.session_state.tasks = []
     if 'simulation_running' not in st.session_state:
@@ -59,152 +84,522 @@ def init_session_state():
         st.session_state.recording_enabled = False
     if 'last_record_time' not in st.session_state:
         st.session_state.last_record_time = None
+    if 'cells_arr' not in st.session_state:
+        st.session_state.cells_arr = {}
+    if 'last_update_time' not in st.session_state:
+        st.session_state.last_update_time = None
+    if 'rng' not in st.session_state:
+        st.session_state.rng = np.random.default_rng()
+    if 'data_version' not in st.session_state:
+        st.session_state.data_version = 0
+    if 'task_assignments' not in st.session_state:
+        st.session_state.task_assignments = {}
+    if 'export_ts' not in st.session_state:
+        st.session_state.export_ts = None
+    if 'cell_table' not in st.session_state:
+        st.session_state.cell_table = None
+    if 'cell_ids' not in st.session_state:
+        st.session_state.cell_ids = ()
+    if 'cell_rows' not in st.session_state:
+        st.session_state.cell_rows = {}
+    if 'task_groups' not in st.session_state:
+        st.session_state.task_groups = {}
+    if 'tasks_arr' not in st.session_state:
+        st.session_state.tasks_arr = np.array([], dtype=object)
+    if 'task_modes' not in st.session_state:
+        st.session_state.task_modes = np.array([], dtype=np.intp)
+    if 'charts_auto_refresh' not in st.session_state:
+        st.session_state.charts_auto_refresh = True
+    if 'record_buffer' not in st.session_state:
+        st.session_state.record_buffer = []
+    if 'record_buffer_start' not in st.session_state:
+        st.session_state.record_buffer_start = None
+    if 'record_file' not in st.session_state:
+        st.session_state.record_file = None
+    if 'record_writer' not in st.session_state:
+        st.session_state.record_writer = None
 
 init_session_state()
 
-def get_cell_status(voltage, min_voltage, max_voltage):
-    """Determine cell status based on voltage"""
-    voltage_percent = (voltage - min_voltage) / (max_voltage - min_voltage) * 100
-    if voltage_percent < 20:
-        return ("Critical", "status-critical")
-    elif voltage_percent < 50:
-        return ("Warning", "status-warning")
-    else:
-        return ("Good", "status-good")
-
-def create_cell_data(cell_type, cell_id):
-    """Create cell data based on type"""
-    base_configs = {
-        "lfp": {"voltage": 3.2, "min_voltage": 2.8, "max_voltage": 3.6},
-        "li-ion": {"voltage": 3.6, "min_voltage": 3.2, "max_voltage": 4.0},
-        "lipo": {"voltage": 3.7, "min_voltage": 3.0, "max_voltage": 4.2},
-        "nicd": {"voltage": 1.2, "min_voltage": 1.0, "max_voltage": 1.4},
-        "nimh": {"voltage": 1.25, "min_voltage": 1.0, "max_voltage": 1.45}
-    }
+# Status labels indexed by how many thresholds a cell's voltage has reached
+STATUS_LABELS = np.array(["Critical", "Warning", "Good"])
+
+def get_status_levels(voltage, crit_threshold, warn_threshold):
+    """Index into STATUS_LABELS for every cell at once from the voltage arrays"""
+    return (voltage >= crit_threshold).astype(np.intp) + (voltage >= warn_threshold)
+
+# Status label, CSS class and icon for the status summary cards
+STATUS_CARDS = (
+    ("Good", "status-good", "🟢"),
+    ("Warning", "status-warning", "🟡"),
+    ("Critical", "status-critical", "🔴")
+)
+
+# Icon-prefixed status shown in the cell table in place of cell styling,
+# in STATUS_LABELS order so status levels can be used as category codes
+STATUS_ICONS = {status: icon for status, _, icon in STATUS_CARDS}
+STATUS_DISPLAY = [f"{STATUS_ICONS[status]} {status}" for status in STATUS_LABELS]
+
+# Voltage limits per cell type
+BASE_CONFIGS = {
+    "lfp": {"voltage": 3.2, "min_voltage": 2.8, "max_voltage": 3.6},
+    "li-ion": {"voltage": 3.6, "min_voltage": 3.2, "max_voltage": 4.0},
+    "lipo": {"voltage": 3.7, "min_voltage": 3.0, "max_voltage": 4.2},
+    "nicd": {"voltage": 1.2, "min_voltage": 1.0, "max_voltage": 1.4},
+    "nimh": {"voltage": 1.25, "min_voltage": 1.0, "max_voltage": 1.45}
+}
+
+# Randomized starting values: field, bounds and the decimals they are kept at
+INIT_RANGES = (
+    ("current", -5.0, 5.0, 3),
+    ("temp", 25, 45, 2),
+    ("capacity", 80, 100, 2),
+    ("resistance", 0.01, 0.1, 4),
+    ("energy", 10, 50, 2),
+    ("soc", 20, 100, 1),  # State of Charge
+    ("soh", 80, 100, 1)  # State of Health
+)
+
+# Numeric cell fields, kept as one float32 array per field for the
+# simulation tick, with the decimals they are reported at
+ARRAY_FIELDS = {"voltage": 3, "current": 3, "temp": 2, "min_voltage": 2, "max_voltage": 2,
+                "capacity": 2, "power": 3, "soc": 1, "resistance": 4}
+
+# Fields that never change after initialization, stored alongside as columns
+STATIC_FIELDS = {"type": object, "cycle_count": np.int32, "energy": np.float32, "soh": np.float32,
+                 "crit_threshold": np.float32, "warn_threshold": np.float32}
+
+# Column order of the exported cell table
+CELL_COLUMNS = ("type", "voltage", "current", "temp", "min_voltage", "max_voltage",
+                "capacity", "cycle_count", "resistance", "power", "energy", "soc", "soh")
+
+# Numeric columns of the dashboard cell table, with their field and the
+# decimals shown (None for integer fields)
+TABLE_COLUMNS = {
+    'Voltage (V)': ("voltage", 3),
+    'Current (A)': ("current", 3),
+    'Power (W)': ("power", 3),
+    'Temperature (°C)': ("temp", 2),
+    'SOC (%)': ("soc", 1),
+    'SOH (%)': ("soh", 1),
+    'Resistance (Ω)': ("resistance", 4),
+    'Cycles': ("cycle_count", None),
+    'Energy (Wh)': ("energy", 2)
+}
+
+def create_cells_data(cell_types, cell_ids):
+    """Create the cell arrays for a batch of cells, drawing each field for all cells at once"""
+    n = len(cell_types)
+    configs = [BASE_CONFIGS.get(cell_type.lower(), BASE_CONFIGS["li-ion"]) for cell_type in cell_types]
+    min_voltage = np.array([config["min_voltage"] for config in configs])
+    max_voltage = np.array([config["max_voltage"] for config in configs])
+    voltage_range = max_voltage - min_voltage
     
-    config = base_configs.get(cell_type.lower(), base_configs["li-ion"])
-    
-    return {
-        "type": cell_type,
-        "voltage": round(random.uniform(config["min_voltage"], config["max_voltage"]), 3),
-        "current": round(random.uniform(-5.0, 5.0), 3),
-        "temp": round(random.uniform(25, 45), 2),
-        "min_voltage": config["min_voltage"],
-        "max_voltage": config["max_voltage"],
-        "capacity": round(random.uniform(80, 100), 2),
-        "cycle_count": random.randint(0, 1000),
-        "resistance": round(random.uniform(0.01, 0.1), 4),
-        "power": 0.0,
-        "energy": round(random.uniform(10, 50), 2),
-        "soc": round(random.uniform(20, 100), 1),  # State of Charge
-        "soh": round(random.uniform(80, 100), 1),  # State of Health
-        "timestamp": datetime.now()
+    rng = st.session_state.rng
+    columns = {
+        "type": cell_types,
+        "voltage": np.round(rng.uniform(min_voltage, max_voltage), 3),
+        "min_voltage": min_voltage,
+        "max_voltage": max_voltage,
+        # Status thresholds at 20% and 50% of the voltage range
+        "crit_threshold": np.round(min_voltage + 0.2 * voltage_range, 4),
+        "warn_threshold": np.round(min_voltage + 0.5 * voltage_range, 4),
+        "cycle_count": rng.integers(0, 1000, n, endpoint=True),
+        "power": np.zeros(n)
     }
+    for field, low, high, decimals in INIT_RANGES:
+        columns[field] = np.round(rng.uniform(low, high, n), decimals)
+    
+    # Store the drawn columns as the Structure-of-Arrays cell state
+    arr = {field: np.asarray(columns[field], dtype=np.float32) for field in ARRAY_FIELDS}
+    for field, dtype in STATIC_FIELDS.items():
+        arr[field] = np.asarray(columns[field], dtype=dtype)
+    st.session_state.cells_arr = arr
+    # Cell ids in array order, and each id's row, for widget options and lookups
+    st.session_state.cell_ids = tuple(cell_ids)
+    st.session_state.cell_rows = {cell_id: row for row, cell_id in enumerate(cell_ids)}
+    st.session_state.data_version += 1
+    build_task_arrays()
 
-def update_cell_data():
-    """Simulate real-time data updates"""
-    for cell_id in st.session_state.cells_data:
-        cell = st.session_state.cells_data[cell_id]
-        
-        # Simulate voltage fluctuation based on task
-        current_task = st.session_state.tasks[0] if st.session_state.tasks else "IDLE"
-        
-        if current_task == "CC_CV":  # Charging
-            voltage_change = random.uniform(0.0, 0.02)
-        elif current_task == "CC_CD":  # Discharging
-            voltage_change = random.uniform(-0.02, 0.0)
-        else:  # IDLE
-            voltage_change = random.uniform(-0.01, 0.01)
-            
-        new_voltage = cell["voltage"] + voltage_change
-        cell["voltage"] = round(max(cell["min_voltage"], min(cell["max_voltage"], new_voltage)), 3)
-        
-        # Update current based on task
-        if current_task == "CC_CV":
-            cell["current"] = round(random.uniform(0.5, 3.0), 3)
-        elif current_task == "CC_CD":
-            cell["current"] = round(random.uniform(-3.0, -0.5), 3)
-        else:
-            cell["current"] = round(random.uniform(-0.5, 0.5), 3)
-        
-        # Simulate temperature changes
-        temp_change = random.uniform(-0.5, 0.5)
-        cell["temp"] = round(max(15, min(65, cell["temp"] + temp_change)), 2)
-        
-        # Calculate power
-        cell["power"] = round(cell["voltage"] * cell["current"], 3)
-        
-        # Update capacity and SOC based on voltage
-        voltage_ratio = (cell["voltage"] - cell["min_voltage"]) / (cell["max_voltage"] - cell["min_voltage"])
-        cell["capacity"] = round(voltage_ratio * 100, 2)
-        cell["soc"] = round(max(0, min(100, voltage_ratio * 100)), 1)
-        
-        # Simulate resistance changes
-        cell["resistance"] = round(max(0.005, cell["resistance"] + random.uniform(-0.001, 0.001)), 4)
-        
-        # Update timestamp
-        cell["timestamp"] = datetime.now()
+def get_rounded_field(field):
+    """A cells_arr field as float64, rounded to the decimals it is reported at"""
+    return np.round(st.session_state.cells_arr[field].astype(np.float64), ARRAY_FIELDS[field])
 
-def record_data_to_csv():
-    """Record current cell data to CSV file with timestamp"""
-    if not st.session_state.cells_data:
-        return False
+def snapshot_cells_arrays():
+    """Copy the exported cell columns, rounded, so later ticks don't change them"""
+    arr = st.session_state.cells_arr
+    return {column: get_rounded_field(column) if column in ARRAY_FIELDS else arr[column].copy()
+            for column in CELL_COLUMNS}
+
+def build_current_csv(arr, cell_ids):
+    """Serialize a snapshot of the cell table, built straight from the arrays"""
+    current_data_df = pd.DataFrame(arr, index=cell_ids)
+    current_data_df['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return current_data_df.to_csv(index=True)
+
+def build_historical_csv(chunks):
+    """Serialize a snapshot of the recorded chunks; runs off the script thread on download"""
+    return pd.concat(chunks, ignore_index=True).to_csv(index=False)
+
+def get_export_timestamp():
+    """Timestamp for download file names, fixed until the data changes"""
+    cached = st.session_state.export_ts
+    if cached is None or cached[0] != st.session_state.data_version:
+        st.session_state.export_ts = (st.session_state.data_version,
+                                      datetime.now().strftime('%Y%m%d_%H%M%S'))
+    return st.session_state.export_ts[1]
+
+def read_file_bytes(path):
+    """Read a file for download"""
+    with open(path, 'rb') as file:
+        return file.read()
+
+def _tick_numpy(voltage, current, temp, power, capacity, soc, resistance,
+                min_voltage, max_voltage, voltage_change, current_draw,
+                temp_change, resistance_change):
+    """Apply one simulation step to the cell arrays in place
+
+    Values are kept at full float32 precision; they are rounded to their
+    ARRAY_FIELDS decimals only when read out for display, recording or export.
+    """
+    np.clip(voltage + voltage_change, min_voltage, max_voltage, out=voltage)
+    current[:] = current_draw
     
-    # Prepare data for recording
-    records = []
-    current_time = datetime.now()
+    # Simulate temperature changes
+    np.clip(temp + temp_change, 15, 65, out=temp)
     
-    for cell_id, cell_data in st.session_state.cells_data.items():
-        record = {
-            'timestamp': current_time.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
-            'cell_id': cell_id,
-            'cell_type': cell_data['type'],
-            'voltage': cell_data['voltage'],
-            'current': cell_data['current'],
-            'temperature': cell_data['temp'],
-            'capacity': cell_data['capacity'],
-            'power': cell_data['power'],
-            'resistance': cell_data['resistance'],
-            'soc': cell_data['soc'],
-            'soh': cell_data['soh'],
-            'energy': cell_data['energy'],
-            'cycle_count': cell_data['cycle_count'],
-            'task': st.session_state.task_assignments.get(cell_id, "IDLE")  # Individual task
-        }
-        records.append(record)
+    # Calculate power
+    np.multiply(voltage, current, out=power)
     
-    # Convert to DataFrame
-    new_data = pd.DataFrame(records)
+    # Update capacity and SOC based on voltage
+    np.multiply((voltage - min_voltage) / (max_voltage - min_voltage), 100, out=capacity)
+    np.clip(capacity, 0, 100, out=soc)
     
-    # Append to existing CSV or create new one
+    # Simulate resistance changes
+    np.maximum(0.005, resistance + resistance_change, out=resistance)
+
+def _tick_kernel(voltage, current, temp, power, capacity, soc, resistance,
+                 min_voltage, max_voltage, voltage_change, current_draw,
+                 temp_change, resistance_change):
+    """Fused single-pass version of _tick_numpy for Numba"""
+    for i in range(voltage.shape[0]):
+        v = min(max_voltage[i], max(min_voltage[i], voltage[i] + voltage_change[i]))
+        c = current_draw[i]
+        voltage[i] = v
+        current[i] = c
+        temp[i] = min(65.0, max(15.0, temp[i] + temp_change[i]))
+        power[i] = v * c
+        ratio = (v - min_voltage[i]) / (max_voltage[i] - min_voltage[i]) * 100.0
+        capacity[i] = ratio
+        soc[i] = min(100.0, max(0.0, ratio))
+        resistance[i] = max(0.005, resistance[i] + resistance_change[i])
+
+# Every _tick_kernel argument is a float32 cell array or random draw
+TICK_SIGNATURE = "void(" + ", ".join(["float32[:]"] * 13) + ")"
+
+@st.cache_resource
+def get_tick():
+    """Return the tick function, compiling the Numba kernel once per process"""
+    if njit is None:
+        return _tick_numpy
+    # An explicit signature compiles eagerly, loading from the on-disk cache when present
+    return njit(TICK_SIGNATURE, cache=True, fastmath=True, boundscheck=False)(_tick_kernel)
+
+# Compile before the first simulation tick rather than during it
+get_tick()
+
+def _normalize_numpy(voltage, min_voltage, max_voltage, soc, soh, temp, current, out):
+    """Write each cell's radar chart values, scaled to 0-100, into a row of out"""
+    out[:, 0] = (voltage - min_voltage) / (max_voltage - min_voltage) * 100
+    out[:, 1] = soc
+    out[:, 2] = soh
+    np.minimum(100, temp / 60 * 100, out=out[:, 3])  # Normalize temp to 0-100
+    np.minimum(100, np.abs(current) / 5 * 100, out=out[:, 4])  # Normalize current to 0-100
+
+def _normalize_kernel(voltage, min_voltage, max_voltage, soc, soh, temp, current, out):
+    """Single-pass version of _normalize_numpy for Numba"""
+    for i in range(voltage.shape[0]):
+        out[i, 0] = (voltage[i] - min_voltage[i]) / (max_voltage[i] - min_voltage[i]) * 100.0
+        out[i, 1] = soc[i]
+        out[i, 2] = soh[i]
+        out[i, 3] = min(100.0, temp[i] / 60.0 * 100.0)
+        out[i, 4] = min(100.0, abs(current[i]) / 5.0 * 100.0)
+
+# Seven float32 cell arrays in RADAR_FIELDS order, then the float64 output matrix
+NORMALIZE_SIGNATURE = "void(" + ", ".join(["float32[:]"] * 7) + ", float64[:, :])"
+
+@st.cache_resource
+def get_normalize():
+    """Return the radar normalization function, compiling it once per process"""
+    if njit is None:
+        return _normalize_numpy
+    return njit(NORMALIZE_SIGNATURE, cache=True, fastmath=True, boundscheck=False)(_normalize_kernel)
+
+get_normalize()
+
+# A running simulation ticks at most this often, however often the script reruns
+SIMULATION_INTERVAL_SEC = 1.0
+
+# Timed reruns can land slightly early; a tick this close to due still runs
+TICK_SLACK_SEC = 0.05
+
+def seconds_until_next_tick():
+    """Time left before the running simulation is due for another tick"""
+    last_update = st.session_state.last_update_time
+    if last_update is None:
+        return 0.0
+    return SIMULATION_INTERVAL_SEC - (datetime.now() - last_update).total_seconds()
+
+# Simulation mode per task; any other task is simulated as idle
+TASK_MODES = {"CC_CV": 1, "CC_CD": 2}
+
+def build_task_arrays():
+    """Align each cell's task and simulation mode with the cell arrays"""
+    assignments = st.session_state.task_assignments
+    tasks = [assignments.get(cell_id, "IDLE") for cell_id in st.session_state.cell_ids]
+    st.session_state.tasks_arr = np.array(tasks, dtype=object)
+    st.session_state.task_modes = np.array([TASK_MODES.get(task, 0) for task in tasks],
+                                           dtype=np.intp)
+    # Assigned cells per task, for the task summaries
+    task_groups = {}
+    for cell_id, task in assignments.items():
+        task_groups.setdefault(task, []).append(cell_id)
+    st.session_state.task_groups = task_groups
+    st.session_state.data_version += 1
+
+# Voltage step and current draw ranges indexed by mode (idle, charge, discharge)
+VOLTAGE_CHANGE_RANGES = np.array([(-0.01, 0.01), (0.0, 0.02), (-0.02, 0.0)], dtype=np.float32)
+CURRENT_RANGES = np.array([(-0.5, 0.5), (0.5, 3.0), (-3.0, -0.5)], dtype=np.float32)
+
+def _uniform32(rng, low, high, n):
+    """Draw n float32 samples uniformly from [low, high); bounds may be per-cell arrays"""
+    low = np.asarray(low, dtype=np.float32)
+    high = np.asarray(high, dtype=np.float32)
+    return low + (high - low) * rng.random(n, dtype=np.float32)
+
+def update_cell_data():
+    """Simulate real-time data updates"""
+    arr = st.session_state.cells_arr
+    rng = st.session_state.rng
+    n = len(arr["voltage"])
+    
+    # Simulate voltage fluctuation and current based on each cell's task
+    modes = st.session_state.task_modes
+    voltage_change = _uniform32(rng, *VOLTAGE_CHANGE_RANGES[modes].T, n)
+    current = _uniform32(rng, *CURRENT_RANGES[modes].T, n)
+    
+    tick = get_tick()
+    tick(arr["voltage"], arr["current"], arr["temp"], arr["power"],
+         arr["capacity"], arr["soc"], arr["resistance"],
+         arr["min_voltage"], arr["max_voltage"], voltage_change, current,
+         _uniform32(rng, -0.5, 0.5, n), _uniform32(rng, -0.001, 0.001, n))
+    
+    st.session_state.last_update_time = datetime.now()
+    st.session_state.data_version += 1
+
+# Columns of the recorded data log
+RECORD_FIELDS = ("timestamp", "cell_id", "cell_type", "voltage", "current", "temperature",
+                 "capacity", "power", "resistance", "soc", "soh", "energy", "cycle_count", "task")
+
+# Recorded columns taken from cells_arr, with their field and the decimals
+# kept (None for non-float fields)
+RECORD_ARRAY_COLUMNS = {
+    "cell_type": ("type", None),
+    "voltage": ("voltage", 3),
+    "current": ("current", 3),
+    "temperature": ("temp", 2),
+    "capacity": ("capacity", 2),
+    "power": ("power", 3),
+    "resistance": ("resistance", 4),
+    "soc": ("soc", 1),
+    "soh": ("soh", 1),
+    "energy": ("energy", 2),
+    "cycle_count": ("cycle_count", None)
+}
+
+# Arrow types of the recorded columns, used when logging to Parquet
+RECORD_SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("ms")), ("cell_id", pa.string()), ("cell_type", pa.string()),
+    ("voltage", pa.float64()), ("current", pa.float64()), ("temperature", pa.float64()),
+    ("capacity", pa.float64()), ("power", pa.float64()), ("resistance", pa.float64()),
+    ("soc", pa.float64()), ("soh", pa.float64()), ("energy", pa.float64()),
+    ("cycle_count", pa.int64()), ("task", pa.string())
+]) if pa is not None else None
+
+# Buffered records are written to disk once this many rows are pending, or
+# once the oldest of them has waited this many seconds
+RECORD_FLUSH_ROWS = 64
+RECORD_FLUSH_SEC = 5.0
+
+def is_parquet_path(path):
+    """Whether a data file is logged as Parquet rather than CSV"""
+    return path.lower().endswith(".parquet")
+
+def write_parquet_part(path, table):
+    """Add a table to the Parquet dataset directory at path as one new part file"""
+    if pa is None:
+        raise ImportError("pyarrow is required to record to a .parquet file")
+    if os.path.isfile(path):
+        # A single-file log from an older version becomes the dataset's first part
+        moved = f"{path}.moving"
+        os.replace(path, moved)
+        os.makedirs(path)
+        os.replace(moved, os.path.join(path, "part-0.parquet"))
+    os.makedirs(path, exist_ok=True)
+    # Each part is complete on disk before it becomes visible: readers skip
+    # dot-prefixed files, and the rename into place is atomic
+    name = f"part-{time.time_ns()}.parquet"
+    temp_path = os.path.join(path, f".{name}.tmp")
+    pq.write_table(table, temp_path, compression="zstd")
+    os.replace(temp_path, os.path.join(path, name))
+
+def get_data_file_size(path):
+    """Size of the data file, or of all parts of a Parquet dataset directory"""
+    if os.path.isdir(path):
+        return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+    return os.path.getsize(path)
+
+def build_parquet_bytes(path):
+    """Combine a Parquet dataset directory into one file's bytes for download"""
+    sink = pa.BufferOutputStream()
+    pq.write_table(pq.read_table(path), sink, compression="zstd")
+    return sink.getvalue().to_pybytes()
+
+def get_record_writer():
+    """Return the CSV data file's writer, opening the file on first use"""
+    if st.session_state.record_writer is None:
+        path = st.session_state.data_file_path
+        write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+        file = open(path, 'a', newline='', buffering=1 << 20)
+        writer = csv.writer(file)
+        if write_header:
+            writer.writerow(RECORD_FIELDS)
+        st.session_state.record_file = file
+        st.session_state.record_writer = writer
+    return st.session_state.record_writer
+
+def close_record_file():
+    """Close the data file kept open while recording"""
+    if st.session_state.record_file is not None:
+        st.session_state.record_file.close()
+        st.session_state.record_file = None
+        st.session_state.record_writer = None
+
+def flush_record_buffer(close=False):
+    """Append buffered records to the data file in one write"""
+    buffer = st.session_state.record_buffer
     try:
-        if os.path.exists(st.session_state.data_file_path):
-            # Append to existing file
-            new_data.to_csv(st.session_state.data_file_path, mode='a', header=False, index=False)
-        else:
-            # Create new file with headers
-            new_data.to_csv(st.session_state.data_file_path, index=False)
-        
-        # Update historical data in session state
-        if st.session_state.historical_data.empty:
-            st.session_state.historical_data = new_data
-        else:
-            st.session_state.historical_data = pd.concat([st.session_state.historical_data, new_data], 
-                                                        ignore_index=True)
-        
-        st.session_state.last_record_time = current_time
+        if buffer:
+            path = st.session_state.data_file_path
+            if is_parquet_path(path):
+                # Each flush becomes one part file, so no half-written file is held open
+                batch = pa.Table.from_pydict(dict(zip(RECORD_FIELDS, map(list, zip(*buffer)))))
+                write_parquet_part(path, batch.cast(RECORD_SCHEMA))
+            else:
+                get_record_writer().writerows(buffer)
+                # Hand the rows to the OS so anything reading the file sees them
+                st.session_state.record_file.flush()
+            buffer.clear()
+        if close:
+            close_record_file()
         return True
     except Exception as e:
         st.error(f"Error recording data: {str(e)}")
         return False
 
+def record_data_to_csv(flush=False):
+    """Record current cell data to CSV file with timestamp"""
+    if not st.session_state.cell_ids:
+        return False
+    
+    # Prepare data for recording, one column per field straight from the arrays
+    arr = st.session_state.cells_arr
+    cell_ids = st.session_state.cell_ids
+    current_time = datetime.now()
+    columns = {'cell_id': cell_ids}
+    for column, (field, decimals) in RECORD_ARRAY_COLUMNS.items():
+        values = arr[field] if decimals is None else np.round(arr[field].astype(np.float64), decimals)
+        columns[column] = values.tolist()
+    columns['task'] = st.session_state.tasks_arr.tolist()  # Individual task
+    
+    # Buffer records as row tuples and only touch the file once enough are pending;
+    # the timestamp is formatted as text only for the file rows
+    stamp = current_time.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+    buffer = st.session_state.record_buffer
+    if not buffer:
+        st.session_state.record_buffer_start = current_time
+    buffer.extend(zip(repeat(stamp), *columns.values()))
+    pending_sec = (current_time - st.session_state.record_buffer_start).total_seconds()
+    if flush or len(buffer) >= RECORD_FLUSH_ROWS or pending_sec >= RECORD_FLUSH_SEC:
+        if not flush_record_buffer():
+            return False
+    
+    # Keep each batch as its own chunk; get_historical_data() appends them on read.
+    # The timestamp stays datetime64, matching history loaded back from the file
+    chunk = pd.DataFrame(columns)
+    chunk.insert(0, 'timestamp', np.datetime64(current_time, 'ms'))
+    st.session_state.historical_chunks.append(chunk)
+    st.session_state.historical_rows += len(cell_ids)
+    
+    st.session_state.last_record_time = current_time
+    return True
+
+def set_historical_chunks(chunks):
+    """Replace the in-memory history and drop its concatenated copy"""
+    st.session_state.historical_chunks = chunks
+    st.session_state.historical_rows = sum(len(chunk) for chunk in chunks)
+    st.session_state.historical_cache = None
+    st.session_state.time_series_cache = None
+
+def get_historical_data():
+    """The recorded chunks as one DataFrame, appending only chunks added since the last call"""
+    chunks = st.session_state.historical_chunks
+    n_chunks, n_rows, columns = st.session_state.historical_cache or (0, 0, {})
+    if len(chunks) > n_chunks:
+        added = pd.concat(chunks[n_chunks:], ignore_index=True)
+        if columns and list(added.columns) != list(columns):
+            # Chunks with other columns; start over from the whole history
+            n_rows, columns = 0, {}
+            added = pd.concat(chunks, ignore_index=True)
+        end = n_rows + len(added)
+        if not columns or end > len(next(iter(columns.values()))):
+            # Grow the column buffers geometrically so earlier rows are only
+            # copied O(log n) times instead of on every new chunk
+            capacity = max(end, 2 * n_rows)
+            grown = {}
+            for name in added.columns:
+                dtype = columns[name].dtype if columns else added[name].to_numpy().dtype
+                grown[name] = np.empty(capacity, dtype=dtype)
+                if columns:
+                    grown[name][:n_rows] = columns[name][:n_rows]
+            columns = grown
+        for name in added.columns:
+            columns[name][n_rows:end] = added[name].to_numpy()
+        n_rows = end
+        st.session_state.historical_cache = (len(chunks), n_rows, columns)
+    # Views into the buffers; later appends only write past n_rows
+    return pd.DataFrame({name: values[:n_rows] for name, values in columns.items()}, copy=False)
+
+@st.cache_data(max_entries=4)
+def read_data_file(path, mtime):
+    """Parse a data log; mtime is part of the cache key so edits invalidate it"""
+    if is_parquet_path(path):
+        return pd.read_parquet(path)
+    if pa is not None:
+        try:
+            # Arrow parses columns in parallel and reads the ISO timestamps natively
+            return pacsv.read_csv(path).to_pandas()
+        except pa.ArrowInvalid:
+            pass  # Malformed rows; let pandas report or tolerate them
+    return pd.read_csv(path, parse_dates=['timestamp'])
+
 def load_historical_data():
-    """Load historical data from CSV file"""
+    """Load historical data from the CSV or Parquet data file"""
     try:
-        if os.path.exists(st.session_state.data_file_path):
-            df = pd.read_csv(st.session_state.data_file_path)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            st.session_state.historical_data = df
+        path = st.session_state.data_file_path
+        if os.path.exists(path):
+            df = read_data_file(path, os.path.getmtime(path))
+            set_historical_chunks([df])
             return df
         else:
             return pd.DataFrame()
@@ -212,6 +607,255 @@ def load_historical_data():
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
 
+# Lowercase metric options of the other charts mapped to their cells_arr field
+PLOT_FIELDS = {"voltage": "voltage", "current": "current", "temperature": "temp",
+               "power": "power", "soc": "soc", "resistance": "resistance"}
+
+# Current Metrics options mapped to their cells_arr field and unit
+METRIC_FIELDS = {
+    "Voltage": ("voltage", "V"),
+    "Current": ("current", "A"),
+    "Power": ("power", "W"),
+    "Temperature": ("temp", "°C"),
+    "SOC": ("soc", "%"),
+    "Resistance": ("resistance", "Ω")
+}
+
+# Layout shared by every chart; a constant uirevision lets Plotly keep zoom and
+# legend state and patch the chart in place when it is redrawn on a rerun
+CHART_LAYOUT = dict(height=400, uirevision="cells")
+
+@st.cache_data(max_entries=32)
+def build_metric_bar_fig(cell_names, values, metric_type, unit):
+    """Build the per-cell bar chart for the selected metric"""
+    fig = px.bar(x=list(cell_names), y=values, 
+                 title=f"{metric_type} by Cell (Bar Chart)",
+                 labels={'x': 'Cell ID', 'y': f'{metric_type} ({unit})'})
+    fig.update_layout(CHART_LAYOUT)
+    return fig
+
+@st.cache_data(max_entries=32)
+def build_status_pie_fig(status_names, status_counts):
+    """Build the cell status distribution pie chart"""
+    fig = px.pie(values=list(status_counts), 
+                 names=list(status_names),
+                 title="Cell Status Distribution")
+    fig.update_layout(CHART_LAYOUT)
+    return fig
+
+RADAR_AXES = ['Voltage %', 'SOC %', 'SOH %', 'Temp %', 'Current %']
+
+# cells_arr fields passed to the radar normalization, in argument order
+RADAR_FIELDS = ("voltage", "min_voltage", "max_voltage", "soc", "soh", "temp", "current")
+
+@st.cache_data(max_entries=32)
+def build_radar_fig(cell_ids, normalized_rows):
+    """Build the normalized cell comparison radar chart"""
+    fig = go.Figure()
+    for cell_id, normalized_values in zip(cell_ids, normalized_rows):
+        fig.add_trace(go.Scatterpolar(
+            r=normalized_values.tolist(),
+            theta=RADAR_AXES,
+            fill='toself',
+            name=cell_id
+        ))
+    
+    fig.update_layout(
+        CHART_LAYOUT,
+        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+        title="Cell Comparison (Normalized %)",
+        height=500
+    )
+    return fig
+
+@st.cache_data(max_entries=32)
+def build_box_fig(values, metric):
+    """Build the box plot of one metric across cells"""
+    fig = go.Figure()
+    fig.add_trace(go.Box(y=values, name=metric.title()))
+    fig.update_layout(CHART_LAYOUT, title=f"{metric.title()} Distribution")
+    return fig
+
+@st.cache_data(max_entries=32)
+def build_histogram_fig(values, metric):
+    """Build the histogram of one metric across cells"""
+    # Bin here so only the bin counts are sent to the browser, not every value
+    counts, edges = np.histogram(values, bins=10)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts,
+                           width=np.diff(edges)))
+    fig.update_layout(CHART_LAYOUT, title=f"{metric.title()} Distribution",
+                      xaxis_title="x", yaxis_title="count")
+    return fig
+
+@st.cache_data(max_entries=32)
+def build_scatter_fig(x_values, y_values, x_metric, y_metric):
+    """Build the scatter plot of one metric against another across cells"""
+    df = pd.DataFrame({x_metric: x_values, y_metric: y_values})
+    fig = px.scatter(df, x=x_metric, y=y_metric,
+                     title=f"{y_metric.title()} vs {x_metric.title()}")
+    fig.update_layout(CHART_LAYOUT)
+    return fig
+
+# Correlation matrix labels mapped to their cells_arr field
+CORR_FIELDS = {"Voltage": "voltage", "Current": "current", "Temperature": "temp",
+               "Power": "power", "SOC": "soc", "Resistance": "resistance"}
+
+@st.cache_data(max_entries=32)
+def build_correlation_fig(values):
+    """Build the parameter correlation heatmap from a (cells, CORR_FIELDS) array"""
+    corr_matrix = pd.DataFrame(values, columns=list(CORR_FIELDS)).corr()
+    fig = px.imshow(corr_matrix, 
+                    title="Parameter Correlation Matrix",
+                    color_continuous_scale="RdBu")
+    fig.update_layout(CHART_LAYOUT, height=500)
+    return fig
+
+def get_time_series_view(ts_metric):
+    """Time series figure and stats, rebuilt only when history or metric changes"""
+    key = (len(st.session_state.historical_chunks), ts_metric)
+    cached = st.session_state.time_series_cache
+    if cached is None or cached[0] != key:
+        historical_data = get_historical_data()
+        
+        # Multi-line time series
+        fig_ts = px.line(historical_data, 
+                       x='timestamp', y=ts_metric, color='cell_id',
+                       title=f"{ts_metric.title()} Over Time")
+        fig_ts.update_layout(CHART_LAYOUT, height=500)
+        
+        ts_stats = historical_data.groupby('cell_id')[ts_metric].agg(['mean', 'min', 'max', 'std'])
+        st.session_state.time_series_cache = (key, fig_ts, ts_stats)
+    return st.session_state.time_series_cache[1:]
+
+def get_cell_table(status_levels):
+    """Dashboard cell table, rebuilt only when the data version changes"""
+    cached = st.session_state.cell_table
+    if cached is None or cached[0] != st.session_state.data_version:
+        arr = st.session_state.cells_arr
+        # Build the table straight from the arrays, one column at a time; status
+        # levels double as category codes, so no per-cell label lookup is needed
+        table = {
+            'Cell ID': st.session_state.cell_ids,
+            'Type': arr["type"],
+            'Task': st.session_state.tasks_arr,
+            'Status': pd.Categorical.from_codes(status_levels, STATUS_DISPLAY)
+        }
+        for column, (field, decimals) in TABLE_COLUMNS.items():
+            values = arr[field]
+            table[column] = values if decimals is None else np.round(values.astype(np.float64), decimals)
+        st.session_state.cell_table = (st.session_state.data_version, pd.DataFrame(table))
+    return st.session_state.cell_table[1]
+
+# Chart fragments: their widgets rerun only the chart they drive, not the whole script
+@st.fragment
+def render_radar_chart():
+    cell_ids = st.session_state.cell_ids
+    selected_cells = st.multiselect("Select Cells to Compare", 
+                                   cell_ids,
+                                   default=cell_ids[:3])
+    
+    if selected_cells:
+        cells_arr = st.session_state.cells_arr
+        cell_rows = st.session_state.cell_rows
+        rows = [cell_rows[cell_id] for cell_id in selected_cells]
+        # Normalize values for radar chart, one (selected cells, 5) matrix
+        normalized = np.empty((len(rows), len(RADAR_AXES)))
+        get_normalize()(*(cells_arr[field][rows] for field in RADAR_FIELDS), normalized)
+        
+        fig_radar = build_radar_fig(tuple(selected_cells), np.round(normalized, 2))
+        st.plotly_chart(fig_radar, use_container_width=True)
+
+@st.fragment
+def render_box_chart():
+    box_metric = st.selectbox("Box Plot Metric", 
+                            ["voltage", "current", "temperature", "soc"],
+                            key="box_metric")
+    
+    box_data = get_rounded_field(PLOT_FIELDS[box_metric])
+    
+    fig_box = build_box_fig(box_data, box_metric)
+    st.plotly_chart(fig_box, use_container_width=True)
+
+@st.fragment
+def render_histogram_chart():
+    hist_metric = st.selectbox("Histogram Metric", 
+                             ["voltage", "current", "temperature", "power"],
+                             key="hist_metric")
+    
+    hist_data = get_rounded_field(PLOT_FIELDS[hist_metric])
+    
+    fig_hist = build_histogram_fig(hist_data, hist_metric)
+    st.plotly_chart(fig_hist, use_container_width=True)
+
+@st.fragment
+def render_scatter_chart():
+    scatter_x = st.selectbox("X-axis", ["voltage", "current", "temperature"],
+                           key="scatter_x")
+    scatter_y = st.selectbox("Y-axis", ["power", "soc", "resistance"],
+                           key="scatter_y")
+    
+    x_data = get_rounded_field(PLOT_FIELDS[scatter_x])
+    y_data = get_rounded_field(PLOT_FIELDS[scatter_y])
+    
+    fig_scatter = build_scatter_fig(x_data, y_data, scatter_x, scatter_y)
+    st.plotly_chart(fig_scatter, use_container_width=True)
+
+def render_downloads():
+    """Sidebar downloads, with snapshots taken from the latest data on each run"""
+    st.subheader("⬇️ Download Data")
+    
+    download_col1, download_col2 = st.columns(2)
+    export_ts = get_export_timestamp()
+    
+    # Downloads are passed as callables so they are only serialized when clicked,
+    # and clicking one doesn't rerun the app
+    with download_col1:
+        # Download current data
+        if st.session_state.cell_ids:
+            st.download_button(
+                label="📊 Download Current Data",
+                data=partial(build_current_csv, snapshot_cells_arrays(),
+                             st.session_state.cell_ids),
+                file_name=f"current_battery_data_{export_ts}.csv",
+                mime="text/csv",
+                use_container_width=True,
+                on_click="ignore"
+            )
+    
+    with download_col2:
+        # Download historical data
+        if st.session_state.historical_chunks:
+            st.download_button(
+                label="📈 Download Historical Data",
+                data=partial(build_historical_csv, tuple(st.session_state.historical_chunks)),
+                file_name=f"historical_battery_data_{export_ts}.csv",
+                mime="text/csv",
+                use_container_width=True,
+                on_click="ignore"
+            )
+        else:
+            st.info("No historical data to download")
+    
+    # Download complete dataset (if the data file exists)
+    data_path = st.session_state.data_file_path
+    data_is_parquet = is_parquet_path(data_path)
+    if os.path.exists(data_path):
+        try:
+            file_size = get_data_file_size(data_path)
+            file_size_mb = file_size / (1024 * 1024)
+            
+            st.download_button(
+                label=f"💾 Download Complete Dataset ({file_size_mb:.2f} MB)",
+                data=partial(build_parquet_bytes if os.path.isdir(data_path) else read_file_bytes,
+                             data_path),
+                file_name=f"complete_{data_path}",
+                mime="application/vnd.apache.parquet" if data_is_parquet else "text/csv",
+                use_container_width=True,
+                on_click="ignore"
+            )
+        except Exception as e:
+            st.error(f"Error reading file: {str(e)}")
+
 # Main header
 st.title("🔋 Battery Cell Data Logger & Monitoring System")
 
@@ -224,10 +868,17 @@ with st.sidebar:
     
     data_file = st.text_input("Data File Name", value=st.session_state.data_file_path)
     if data_file != st.session_state.data_file_path:
+        # Pending records belong to the previous file
+        flush_record_buffer(close=True)
         st.session_state.data_file_path = data_file
     
-    st.session_state.recording_enabled = st.checkbox("Enable Data Recording", 
-                                                     value=st.session_state.recording_enabled)
+    recording_enabled = st.checkbox("Enable Data Recording", 
+                                    value=st.session_state.recording_enabled)
+    if st.session_state.recording_enabled and not recording_enabled:
+        # Close once when recording is switched off; manual records after that
+        # keep the CSV file open instead of reopening it on every click
+        flush_record_buffer(close=True)
+    st.session_state.recording_enabled = recording_enabled
     
     recording_interval = st.selectbox("Recording Interval", 
                                      ["1 second", "5 seconds", "10 seconds", "30 seconds", "1 minute"],
@@ -272,11 +923,9 @@ with st.sidebar:
     
     # Initialize cells
     if st.button("🔄 Initialize Cells", type="primary"):
-        st.session_state.cells_data = {}
-        for i in range(num_cells):
-            cell_type = cell_configs[i] if i < len(cell_configs) else "Li-Ion"
-            cell_id = f"cell_{i+1:02d}_{cell_type.lower()}"
-            st.session_state.cells_data[cell_id] = create_cell_data(cell_type, cell_id)
+        init_types = [cell_configs[i] if i < len(cell_configs) else "Li-Ion" for i in range(num_cells)]
+        init_ids = [f"cell_{i+1:02d}_{cell_type.lower()}" for i, cell_type in enumerate(init_types)]
+        create_cells_data(init_types, init_ids)
         st.success(f"✅ {num_cells} cells initialized!")
     
     # Task configuration
@@ -288,29 +937,26 @@ with st.sidebar:
                         ["Single Task (All Cells)", "Individual Tasks", "Group Tasks"],
                         horizontal=True)
     
-    # Initialize task assignments if not exists
-    if 'task_assignments' not in st.session_state:
-        st.session_state.task_assignments = {}
-    
     if task_mode == "Single Task (All Cells)":
         # Single task for all cells
         selected_task = st.selectbox("Task for All Cells", task_options)
         
         if st.button("📋 Apply to All Cells"):
-            for cell_id in st.session_state.cells_data.keys():
-                st.session_state.task_assignments[cell_id] = selected_task
+            st.session_state.task_assignments.update(
+                dict.fromkeys(st.session_state.cell_ids, selected_task))
             st.session_state.tasks = [selected_task]  # Keep for backward compatibility
+            build_task_arrays()
             st.success(f"Task '{selected_task}' applied to all cells!")
     
     elif task_mode == "Individual Tasks":
         # Individual task for each cell
         st.write("**Assign tasks to individual cells:**")
         
-        if st.session_state.cells_data:
+        if st.session_state.cell_ids:
             individual_tasks = {}
             
             # Create columns for better layout
-            cells_list = list(st.session_state.cells_data.keys())
+            cells_list = st.session_state.cell_ids
             num_cols = min(2, len(cells_list))
             cols = st.columns(num_cols)
             
@@ -325,6 +971,7 @@ with st.sidebar:
             if st.button("📋 Apply Individual Tasks"):
                 st.session_state.task_assignments = individual_tasks
                 st.session_state.tasks = list(set(individual_tasks.values()))  # Unique tasks
+                build_task_arrays()
                 st.success("Individual tasks applied!")
         else:
             st.info("Initialize cells first to assign individual tasks")
@@ -333,12 +980,12 @@ with st.sidebar:
         # Group-based task assignment
         st.write("**Create task groups:**")
         
-        if st.session_state.cells_data:
+        if st.session_state.cell_ids:
             # Group creation interface
             num_groups = st.number_input("Number of Task Groups", min_value=1, max_value=5, value=2)
             
             group_assignments = {}
-            cells_list = list(st.session_state.cells_data.keys())
+            cells_list = st.session_state.cell_ids
             
             for group_num in range(num_groups):
                 st.write(f"**Group {group_num + 1}:**")
@@ -376,21 +1023,16 @@ with st.sidebar:
             if st.button("📋 Apply Group Tasks"):
                 st.session_state.task_assignments = group_assignments
                 st.session_state.tasks = list(set(group_assignments.values()))  # Unique tasks
+                build_task_arrays()
                 st.success("Group tasks applied!")
         else:
             st.info("Initialize cells first to create task groups")
     
     # Display current task assignments
-    if st.session_state.task_assignments:
+    if st.session_state.task_groups:
         with st.expander("📋 Current Task Assignments"):
-            task_summary = {}
-            for cell_id, task in st.session_state.task_assignments.items():
-                if task not in task_summary:
-                    task_summary[task] = []
-                task_summary[task].append(cell_id)
-            
-            for task, cells in task_summary.items():
-                st.write(f"**{task}:** {', '.join(cells)}")
+            st.markdown("\n\n".join(f"**{task}:** {', '.join(cells)}"
+                                    for task, cells in st.session_state.task_groups.items()))
     
     # Advanced task parameters
     with st.expander("⚙️ Advanced Task Parameters"):
@@ -427,16 +1069,17 @@ with st.sidebar:
     with col2:
         if st.button("⏸️ Stop", use_container_width=True):
             st.session_state.simulation_running = False
+            flush_record_buffer(close=True)
     
     # Manual actions
     if st.button("🔄 Update Data", use_container_width=True):
-        if st.session_state.cells_data:
+        if st.session_state.cell_ids:
             update_cell_data()
             st.success("Data updated!")
     
     if st.button("💾 Record Now", use_container_width=True):
-        if st.session_state.cells_data:
-            if record_data_to_csv():
+        if st.session_state.cell_ids:
+            if record_data_to_csv(flush=True):
                 st.success("Data recorded to CSV!")
             else:
                 st.error("Failed to record data!")
@@ -445,6 +1088,8 @@ with st.sidebar:
     st.subheader("📁 Data Management")
     
     if st.button("📂 Load Historical Data"):
+        # Write out pending records so the load includes them
+        flush_record_buffer(close=True)
         df = load_historical_data()
         if not df.empty:
             st.success(f"Loaded {len(df)} records")
@@ -452,89 +1097,52 @@ with st.sidebar:
             st.info("No historical data found")
     
     if st.button("🗑️ Clear Session Data"):
-        st.session_state.cells_data = {}
-        st.session_state.historical_data = pd.DataFrame()
+        flush_record_buffer(close=True)
+        create_cells_data([], [])
+        set_historical_chunks([])
         st.session_state.tasks = []
         st.session_state.simulation_running = False
         st.success("Session data cleared!")
     
-    # Download options
-    st.subheader("⬇️ Download Data")
+    # While the simulation runs with auto refresh on, the downloads and the
+    # dashboard rerun on their own every tick instead of the whole app
+    refresh_every = (SIMULATION_INTERVAL_SEC if st.session_state.simulation_running
+                     and st.session_state.charts_auto_refresh else None)
     
-    download_col1, download_col2 = st.columns(2)
-    
-    with download_col1:
-        # Download current data
-        if st.session_state.cells_data:
-            current_data_df = pd.DataFrame.from_dict(st.session_state.cells_data, orient='index')
-            current_data_df['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            current_csv = current_data_df.to_csv(index=True)
-            
-            st.download_button(
-                label="📊 Download Current Data",
-                data=current_csv,
-                file_name=f"current_battery_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-    
-    with download_col2:
-        # Download historical data
-        if not st.session_state.historical_data.empty:
-            historical_csv = st.session_state.historical_data.to_csv(index=False)
-            
-            st.download_button(
-                label="📈 Download Historical Data",
-                data=historical_csv,
-                file_name=f"historical_battery_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-        else:
-            st.info("No historical data to download")
-    
-    # Download complete dataset (if CSV file exists)
-    if os.path.exists(st.session_state.data_file_path):
-        try:
-            with open(st.session_state.data_file_path, 'r') as file:
-                complete_csv = file.read()
-            
-            file_size = len(complete_csv)
-            file_size_mb = file_size / (1024 * 1024)
-            
-            st.download_button(
-                label=f"💾 Download Complete Dataset ({file_size_mb:.2f} MB)",
-                data=complete_csv,
-                file_name=f"complete_{st.session_state.data_file_path}",
-                mime="text/csv",
-                use_container_width=True
-            )
-        except Exception as e:
-            st.error(f"Error reading file: {str(e)}")
+    # Download options, refreshed along with the dashboard
+    st.fragment(render_downloads, run_every=refresh_every)()
 
 # Main dashboard area
-if st.session_state.cells_data:
+def render_dashboard(record_interval_sec, recording_interval, refresh_every):
+    """Simulation tick, auto-recording, metrics, cell table and charts"""
+    if not st.session_state.cell_ids:
+        return
     
-    # Auto-update and record when simulation is running
+    # Auto-update and record when simulation is running; reruns from widget
+    # changes in between ticks reuse the unchanged data and its caches
     if st.session_state.simulation_running:
-        update_cell_data()
+        if seconds_until_next_tick() <= TICK_SLACK_SEC:
+            update_cell_data()
         
         # Auto-record based on interval
         if (st.session_state.recording_enabled and 
             (st.session_state.last_record_time is None or 
              (datetime.now() - st.session_state.last_record_time).total_seconds() >= record_interval_sec)):
-            record_data_to_csv()
+            # Records spaced further apart than the flush age would sit in the
+            # buffer for a whole interval, so those are written straight away
+            record_data_to_csv(flush=record_interval_sec >= RECORD_FLUSH_SEC)
     
     # System overview metrics
     st.subheader("📊 System Overview")
     
     col1, col2, col3, col4, col5 = st.columns(5)
     
-    total_cells = len(st.session_state.cells_data)
-    avg_voltage = np.mean([cell["voltage"] for cell in st.session_state.cells_data.values()])
-    avg_current = np.mean([cell["current"] for cell in st.session_state.cells_data.values()])
-    avg_temp = np.mean([cell["temp"] for cell in st.session_state.cells_data.values()])
-    total_power = sum([cell["power"] for cell in st.session_state.cells_data.values()])
+    cells_arr = st.session_state.cells_arr
+    total_cells = len(st.session_state.cell_ids)
+    avg_voltage = cells_arr["voltage"].mean()
+    avg_current = cells_arr["current"].mean()
+    avg_temp = cells_arr["temp"].mean()
+    total_power = cells_arr["power"].sum()
     
     with col1:
         st.metric("🔋 Total Cells", total_cells)
@@ -547,92 +1155,51 @@ if st.session_state.cells_data:
     with col5:
         st.metric("⚡ Total Power", f"{total_power:.2f}W")
     
+    if st.session_state.last_update_time is not None:
+        st.caption(f"Last update: {st.session_state.last_update_time.strftime('%H:%M:%S')}")
+    
     # Status indicators
-    status_info = []
-    for cell_id, cell_data in st.session_state.cells_data.items():
-        status, status_class = get_cell_status(cell_data["voltage"], 
-                                             cell_data["min_voltage"], 
-                                             cell_data["max_voltage"])
-        status_info.append(status)
+    status_levels = get_status_levels(cells_arr["voltage"], cells_arr["crit_threshold"],
+                                      cells_arr["warn_threshold"])
+    # Levels are small integers, so count them directly in STATUS_LABELS order
+    counts = np.bincount(status_levels, minlength=len(STATUS_LABELS))
+    status_counts = dict(zip(STATUS_LABELS.tolist(), counts.tolist()))
     
-    status_counts = pd.Series(status_info).value_counts()
-    
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("🟢 Good Cells", status_counts.get("Good", 0))
-    with col2:
-        st.metric("🟡 Warning Cells", status_counts.get("Warning", 0))
-    with col3:
-        st.metric("🔴 Critical Cells", status_counts.get("Critical", 0))
+    # One HTML grid instead of a column and metric element per status
+    status_cards = "".join(
+        f'<div class="metric-container {status_class}">{icon} {status} Cells<br>'
+        f'<strong style="font-size:1.75rem">{status_counts.get(status, 0)}</strong></div>'
+        for status, status_class, icon in STATUS_CARDS
+    )
+    st.markdown(f'<div style="display:grid;grid-template-columns:repeat({len(STATUS_CARDS)},1fr);'
+                f'gap:1rem">{status_cards}</div>', unsafe_allow_html=True)
     
     # Recording status
     if st.session_state.recording_enabled:
-        record_count = len(st.session_state.historical_data) if not st.session_state.historical_data.empty else 0
-        st.info(f"🔴 Recording enabled | {record_count} records | Interval: {recording_interval} | File: {st.session_state.data_file_path}")
+        st.info(f"🔴 Recording enabled | {st.session_state.historical_rows} records | Interval: {recording_interval} | File: {st.session_state.data_file_path}")
     else:
         st.info("⚪ Recording disabled")
     
     # Current task display - show all active tasks
-    if st.session_state.task_assignments:
-        active_tasks = list(set(st.session_state.task_assignments.values()))
-        if len(active_tasks) == 1:
-            st.info(f"⚡ Current Task: **{active_tasks[0]}** (All Cells)")
+    task_groups = st.session_state.task_groups
+    if task_groups:
+        if len(task_groups) == 1:
+            st.info(f"⚡ Current Task: **{next(iter(task_groups))}** (All Cells)")
         else:
-            tasks_summary = []
-            task_counts = {}
-            for task in st.session_state.task_assignments.values():
-                task_counts[task] = task_counts.get(task, 0) + 1
-            
-            for task, count in task_counts.items():
-                tasks_summary.append(f"**{task}** ({count} cells)")
-            
-            st.info(f"⚡ Active Tasks: {' | '.join(tasks_summary)}")
+            tasks_summary = " | ".join(f"**{task}** ({len(cells)} cells)"
+                                       for task, cells in task_groups.items())
+            st.info(f"⚡ Active Tasks: {tasks_summary}")
     elif st.session_state.tasks:
         st.info(f"⚡ Current Task: **{st.session_state.tasks[0]}**")
     
     # Detailed cell data table
     st.subheader("📋 Cell Data Table")
     
-    # Convert current data to DataFrame for display
-    display_data = []
-    for cell_id, cell_data in st.session_state.cells_data.items():
-        status, _ = get_cell_status(cell_data["voltage"], 
-                                  cell_data["min_voltage"], 
-                                  cell_data["max_voltage"])
-        
-        # Get individual task for this cell
-        individual_task = st.session_state.task_assignments.get(cell_id, "IDLE")
-        
-        display_data.append({
-            'Cell ID': cell_id,
-            'Type': cell_data['type'],
-            'Task': individual_task,
-            'Status': status,
-            'Voltage (V)': cell_data['voltage'],
-            'Current (A)': cell_data['current'],
-            'Power (W)': cell_data['power'],
-            'Temperature (°C)': cell_data['temp'],
-            'SOC (%)': cell_data['soc'],
-            'SOH (%)': cell_data['soh'],
-            'Resistance (Ω)': cell_data['resistance'],
-            'Cycles': cell_data['cycle_count'],
-            'Energy (Wh)': cell_data['energy']
-        })
-    
-    current_df = pd.DataFrame(display_data)
-    
-    # Color code the status
-    def color_status(val):
-        if val == 'Good':
-            return 'background-color: #d4edda'
-        elif val == 'Warning':
-            return 'background-color: #fff3cd'
-        elif val == 'Critical':
-            return 'background-color: #f8d7da'
-        return ''
-    
-    styled_df = current_df.style.applymap(color_status, subset=['Status'])
-    st.dataframe(styled_df, use_container_width=True, height=300)
+    current_df = get_cell_table(status_levels)
+    
+    # Status is conveyed by its icon prefix, so no per-cell Styler callback is needed
+    st.dataframe(current_df, use_container_width=True, height=300,
+                 column_config={'Status': st.column_config.TextColumn('Status')})
     
     # Multiple graph types
     st.subheader("📈 Data Visualization")
@@ -643,68 +1210,43 @@ if st.session_state.cells_data:
         graph_tabs = st.tabs(["📊 Current Metrics", "📈 Time Series", "🔄 Comparison", "📉 Distribution", "🗺️ Correlation"])
     with col2:
         auto_refresh = st.checkbox("Auto Refresh Charts", value=st.session_state.simulation_running)
+    if st.session_state.simulation_running and auto_refresh != (refresh_every is not None):
+        # Rerun the whole app so the timed reruns start or stop
+        st.session_state.charts_auto_refresh = auto_refresh
+        st.rerun()
     
     # Tab 1: Current Metrics
     with graph_tabs[0]:
-        metric_type = st.selectbox("Select Metric", 
-                                  ["Voltage", "Current", "Power", "Temperature", "SOC", "Resistance"])
+        metric_type = st.selectbox("Select Metric", list(METRIC_FIELDS))
         
         # Create different chart types for current data
         chart_col1, chart_col2 = st.columns(2)
         
         with chart_col1:
             # Bar chart
-            cell_names = list(st.session_state.cells_data.keys())
-            if metric_type == "Voltage":
-                values = [st.session_state.cells_data[cell]["voltage"] for cell in cell_names]
-                unit = "V"
-            elif metric_type == "Current":
-                values = [st.session_state.cells_data[cell]["current"] for cell in cell_names]
-                unit = "A"
-            elif metric_type == "Power":
-                values = [st.session_state.cells_data[cell]["power"] for cell in cell_names]
-                unit = "W"
-            elif metric_type == "Temperature":
-                values = [st.session_state.cells_data[cell]["temp"] for cell in cell_names]
-                unit = "°C"
-            elif metric_type == "SOC":
-                values = [st.session_state.cells_data[cell]["soc"] for cell in cell_names]
-                unit = "%"
-            else:  # Resistance
-                values = [st.session_state.cells_data[cell]["resistance"] for cell in cell_names]
-                unit = "Ω"
+            field, unit = METRIC_FIELDS[metric_type]
+            values = get_rounded_field(field)
             
-            fig_bar = px.bar(x=cell_names, y=values, 
-                           title=f"{metric_type} by Cell (Bar Chart)",
-                           labels={'x': 'Cell ID', 'y': f'{metric_type} ({unit})'})
-            fig_bar.update_layout(height=400)
+            fig_bar = build_metric_bar_fig(st.session_state.cell_ids, values, metric_type, unit)
             st.plotly_chart(fig_bar, use_container_width=True)
         
         with chart_col2:
             # Pie chart for status distribution
-            fig_pie = px.pie(values=list(status_counts.values), 
-                           names=list(status_counts.index),
-                           title="Cell Status Distribution")
-            fig_pie.update_layout(height=400)
+            fig_pie = build_status_pie_fig(tuple(status_counts), tuple(status_counts.values()))
             st.plotly_chart(fig_pie, use_container_width=True)
     
     # Tab 2: Time Series
     with graph_tabs[1]:
-        if not st.session_state.historical_data.empty:
+        if st.session_state.historical_chunks:
             ts_metric = st.selectbox("Time Series Metric", 
                                    ["voltage", "current", "power", "temperature", "soc"],
                                    key="ts_metric")
             
-            # Multi-line time series
-            fig_ts = px.line(st.session_state.historical_data, 
-                           x='timestamp', y=ts_metric, color='cell_id',
-                           title=f"{ts_metric.title()} Over Time")
-            fig_ts.update_layout(height=500)
+            fig_ts, ts_stats = get_time_series_view(ts_metric)
             st.plotly_chart(fig_ts, use_container_width=True)
             
             # Show data statistics
             st.write("**Time Series Statistics:**")
-            ts_stats = st.session_state.historical_data.groupby('cell_id')[ts_metric].agg(['mean', 'min', 'max', 'std'])
             st.dataframe(ts_stats)
         else:
             st.info("No historical data available. Enable recording and run simulation to collect time series data.")
@@ -715,60 +1257,12 @@ if st.session_state.cells_data:
         
         with comp_col1:
             # Radar chart comparison
-            if len(st.session_state.cells_data) >= 2:
-                selected_cells = st.multiselect("Select Cells to Compare", 
-                                               list(st.session_state.cells_data.keys()),
-                                               default=list(st.session_state.cells_data.keys())[:3])
-                
-                if selected_cells:
-                    fig_radar = go.Figure()
-                    
-                    for cell_id in selected_cells:
-                        cell = st.session_state.cells_data[cell_id]
-                        # Normalize values for radar chart
-                        normalized_values = [
-                            (cell["voltage"] - cell["min_voltage"]) / (cell["max_voltage"] - cell["min_voltage"]) * 100,
-                            cell["soc"],
-                            cell["soh"],
-                            min(100, cell["temp"] / 60 * 100),  # Normalize temp to 0-100
-                            min(100, abs(cell["current"]) / 5 * 100)  # Normalize current to 0-100
-                        ]
-                        
-                        fig_radar.add_trace(go.Scatterpolar(
-                            r=normalized_values,
-                            theta=['Voltage %', 'SOC %', 'SOH %', 'Temp %', 'Current %'],
-                            fill='toself',
-                            name=cell_id
-                        ))
-                    
-                    fig_radar.update_layout(
-                        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
-                        title="Cell Comparison (Normalized %)",
-                        height=500
-                    )
-                    st.plotly_chart(fig_radar, use_container_width=True)
+            if total_cells >= 2:
+                render_radar_chart()
         
         with comp_col2:
             # Box plot for metric distribution
-            box_metric = st.selectbox("Box Plot Metric", 
-                                    ["voltage", "current", "temperature", "soc"],
-                                    key="box_metric")
-            
-            box_data = []
-            for cell_id, cell_data in st.session_state.cells_data.items():
-                if box_metric == "voltage":
-                    box_data.append(cell_data["voltage"])
-                elif box_metric == "current":
-                    box_data.append(cell_data["current"])
-                elif box_metric == "temperature":
-                    box_data.append(cell_data["temp"])
-                else:  # soc
-                    box_data.append(cell_data["soc"])
-            
-            fig_box = go.Figure()
-            fig_box.add_trace(go.Box(y=box_data, name=box_metric.title()))
-            fig_box.update_layout(title=f"{box_metric.title()} Distribution", height=400)
-            st.plotly_chart(fig_box, use_container_width=True)
+            render_box_chart()
     
     # Tab 4: Distribution
     with graph_tabs[3]:
@@ -776,67 +1270,23 @@ if st.session_state.cells_data:
         
         with hist_col1:
             # Histogram
-            hist_metric = st.selectbox("Histogram Metric", 
-                                     ["voltage", "current", "temperature", "power"],
-                                     key="hist_metric")
-            
-            hist_data = []
-            for cell_data in st.session_state.cells_data.values():
-                if hist_metric == "voltage":
-                    hist_data.append(cell_data["voltage"])
-                elif hist_metric == "current":
-                    hist_data.append(cell_data["current"])
-                elif hist_metric == "temperature":
-                    hist_data.append(cell_data["temp"])
-                else:  # power
-                    hist_data.append(cell_data["power"])
-            
-            fig_hist = px.histogram(x=hist_data, nbins=10, 
-                                  title=f"{hist_metric.title()} Distribution")
-            fig_hist.update_layout(height=400)
-            st.plotly_chart(fig_hist, use_container_width=True)
+            render_histogram_chart()
         
         with hist_col2:
             # Scatter plot
-            if len(st.session_state.cells_data) > 1:
-                scatter_x = st.selectbox("X-axis", ["voltage", "current", "temperature"],
-                                       key="scatter_x")
-                scatter_y = st.selectbox("Y-axis", ["power", "soc", "resistance"],
-                                       key="scatter_y")
-                
-                x_data = [cell[scatter_x if scatter_x != "temperature" else "temp"] 
-                         for cell in st.session_state.cells_data.values()]
-                y_data = [cell[scatter_y] for cell in st.session_state.cells_data.values()]
-                
-                fig_scatter = px.scatter(x=x_data, y=y_data,
-                                       title=f"{scatter_y.title()} vs {scatter_x.title()}")
-                fig_scatter.update_layout(height=400)
-                st.plotly_chart(fig_scatter, use_container_width=True)
+            if total_cells > 1:
+                render_scatter_chart()
     
     # Tab 5: Correlation
     with graph_tabs[4]:
-        if len(st.session_state.cells_data) > 2:
-            # Create correlation matrix
-            corr_data = []
-            for cell_data in st.session_state.cells_data.values():
-                corr_data.append([
-                    cell_data["voltage"],
-                    cell_data["current"],
-                    cell_data["temp"],
-                    cell_data["power"],
-                    cell_data["soc"],
-                    cell_data["resistance"]
-                ])
-            
-            corr_df = pd.DataFrame(corr_data, 
-                                 columns=["Voltage", "Current", "Temperature", 
-                                         "Power", "SOC", "Resistance"])
-            corr_matrix = corr_df.corr()
-            
-            fig_corr = px.imshow(corr_matrix, 
-                               title="Parameter Correlation Matrix",
-                               color_continuous_scale="RdBu")
-            fig_corr.update_layout(height=500)
+        if total_cells > 2:
+            # Create correlation matrix from one (cells, parameters) array
+            corr_values = np.column_stack([get_rounded_field(field) for field in CORR_FIELDS.values()])
+            fig_corr = build_correlation_fig(corr_values)
             st.plotly_chart(fig_corr, use_container_width=True)
         else:
             st.info("Need more cells for meaningful correlation analysis")
+
+# Only the dashboard reruns for each simulation tick; nothing sleeps in the script
+st.fragment(render_dashboard, run_every=refresh_every)(record_interval_sec, recording_interval,
+                                                       refresh_every)